@@ -10,10 +10,11 @@ class ChatChunks:
     reminder: List = field(default_factory=list)
 
     def all_messages(self):
-        return (self.system
-                + self.examples
-                + self.past_scenes
-                + self.cur
-                + self.reminder
-        )
-
+        # a single list grown in place, rather than one temporary per "+"
+        out = []
+        out.extend(self.system)
+        out.extend(self.examples)
+        out.extend(self.past_scenes)
+        out.extend(self.cur)
+        out.extend(self.reminder)
+        return out
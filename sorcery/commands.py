@@ -1,11 +1,15 @@
 """Command processing for Sorcery slash commands."""
 
+from operator import attrgetter
 from typing import Optional, Tuple, Dict, Callable
 from pathlib import Path
 
+from .config import sorcery_dir
 from .state import GameState
 from .input_output import InputOutput
 
+_get_name = attrgetter('name')
+
 
 class CommandProcessor:
     """Processes slash commands in the Sorcery game."""
@@ -30,7 +34,7 @@ class CommandProcessor:
     
     def is_command(self, user_input: str) -> bool:
         """Check if the input is a slash command."""
-        return user_input.startswith('/')
+        return user_input[:1] == '/'
     
     def process_command(self, user_input: str) -> Tuple[bool, bool]:
         """
@@ -42,19 +46,20 @@ class CommandProcessor:
         if not self.is_command(user_input):
             return False, False
         
-        # Parse command and arguments
-        parts = user_input[1:].split()  # Remove leading '/' and split
+        # Parse command and arguments, only splitting when arguments follow
+        parts = user_input[1:].split(None, 1)
         if not parts:
             self.io.display_error("Empty command. Type /help for available commands.")
             return True, False
-        
+
         command = parts[0].lower()
-        args = parts[1:] if len(parts) > 1 else []
-        
+        args = parts[1].split() if len(parts) > 1 else []
+
         # Execute command
-        if command in self.commands:
+        handler = self.commands.get(command)
+        if handler is not None:
             try:
-                return self.commands[command](args)
+                return handler(args)
             except Exception as e:
                 self.io.display_error(f"Error executing command '{command}': {e}")
                 return True, False
@@ -77,7 +82,7 @@ class CommandProcessor:
                     save_path = save_path.with_suffix('.json')
             else:
                 # Use default save location from config
-                save_path = Path.home() / ".sorcery" / "save.json"
+                save_path = sorcery_dir() / "save.json"
             
             self.state.save_to_file(save_path)
             self.io.display_save_confirmation(str(save_path))
@@ -103,23 +108,21 @@ class CommandProcessor:
         """Look around the current location."""
         current_location = self.state.locations.get(self.state.current_location)
         if current_location:
-            location_text = f"Location: {current_location.name}\n"
-            location_text += f"Description: {current_location.description}\n"
+            parts = [
+                f"Location: {current_location.name}\n",
+                f"Description: {current_location.description}\n",
+            ]
             
             if current_location.connections:
-                location_text += f"Exits: {', '.join(current_location.connections)}\n"
+                parts.append(f"Exits: {', '.join(current_location.connections)}\n")
             
             # Add nearby characters
-            nearby_chars = [
-                char for char in self.state.characters.values()
-                if hasattr(char, 'current_location') and 
-                char.current_location == self.state.current_location  # type: ignore
-            ]
+            nearby_chars = self.state.get_characters_at(self.state.current_location)
             
             if nearby_chars:
-                location_text += "Characters present: " + ", ".join(char.name for char in nearby_chars)
+                parts.append("Characters present: " + ", ".join(map(_get_name, nearby_chars)))
             
-            self.io.display_info(location_text, "Current Location")
+            self.io.display_info("".join(parts), "Current Location")
         else:
             self.io.display_info(f"You are at: {self.state.current_location}", "Current Location")
         
@@ -139,17 +142,22 @@ class CommandProcessor:
             self.io.display_info("No locations visited yet.", "Map")
             return True, False
         
-        map_text = "Visited Locations:\n\n"
+        current = self.state.current_location
+        parts = ["Visited Locations:\n\n"]
+        append = parts.append
         for location in visited_locations:
-            marker = " <- Current" if location.name == self.state.current_location else ""
-            map_text += f"📍 {location.name}{marker}\n"
-            if location.description:
-                map_text += f"   {location.description}\n"
-            if location.first_visited:
-                map_text += f"   First visited: {location.first_visited.strftime('%Y-%m-%d %H:%M')}\n"
-            map_text += "\n"
+            name = location.name
+            description = location.description
+            first_visited = location.first_visited
+            marker = " <- Current" if name == current else ""
+            append(f"📍 {name}{marker}\n")
+            if description:
+                append(f"   {description}\n")
+            if first_visited:
+                append(f"   First visited: {first_visited.strftime('%Y-%m-%d %H:%M')}\n")
+            append("\n")
         
-        self.io.display_info(map_text.strip(), "Map")
+        self.io.display_info("".join(parts).strip(), "Map")
         return True, False
     
     def exit_command(self, args: list) -> Tuple[bool, bool]:
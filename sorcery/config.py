@@ -2,15 +2,27 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
+_SORCERY_DIR: Optional[Path] = None
+
+
+def sorcery_dir() -> Path:
+    """Return the ~/.sorcery directory, creating it on first use."""
+    global _SORCERY_DIR
+    if _SORCERY_DIR is None:
+        _SORCERY_DIR = Path.home() / ".sorcery"
+        _SORCERY_DIR.mkdir(exist_ok=True)
+    return _SORCERY_DIR
+
 
 class Config(BaseModel):
     """Configuration for Sorcery game."""
     
     model: str = Field(default="gpt-4o-mini", description="LLM model to use")
+    fallback_models: List[str] = Field(default_factory=list, description="Models to fall back to, in order")
     openai_api_key: Optional[str] = Field(default=None, description="API key for OpenAI LLM service")
     anthropic_api_key: Optional[str] = Field(default=None, description="API key for Anthropic LLM service")
     save_file: Optional[Path] = Field(default=None, description="Path to save file")
@@ -23,16 +35,14 @@ class Config(BaseModel):
         
         # Set default save file location
         if self.save_file is None:
-            sorcery_dir = Path.home() / ".sorcery"
-            sorcery_dir.mkdir(exist_ok=True)
-            self.save_file = sorcery_dir / "save.json"
+            self.save_file = sorcery_dir() / "save.json"
         
         # Get API key from environment if not provided
-        if self.openai_api_key is None and os.getenv("OPENAI_API_KEY"):
-            self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        if self.openai_api_key is None:
+            self.openai_api_key = os.getenv("OPENAI_API_KEY") or None
 
-        if self.anthropic_api_key is None and os.getenv("ANTHROPIC_API_KEY"):
-            self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
+        if self.anthropic_api_key is None:
+            self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY") or None
         
         # Validate API key
         if not self.openai_api_key and not self.anthropic_api_key:
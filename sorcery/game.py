@@ -1,9 +1,8 @@
 """Main game class for Sorcery."""
 
-from pathlib import Path
 from typing import Optional
 
-from .config import Config
+from .config import Config, sorcery_dir
 from .state import GameState
 from .input_output import InputOutput
 from .commands import CommandProcessor
@@ -17,14 +16,18 @@ class Game:
         self.io = InputOutput(
             pretty=True,
             no_color=config.no_color,
-            input_history_file=str(Path.home() / ".sorcery" / "input_history.txt")
+            input_history_file=str(sorcery_dir() / "input_history.txt")
         )
         
         # Initialize or load game state
         self.state = self._load_or_create_state()
 
         # Initialize LLM manager
-        self.llm = StoryTeller(io=self.io, model=config.model)
+        self.llm = StoryTeller(
+            io=self.io,
+            model=config.model,
+            fallback_models=config.fallback_models,
+        )
         
         # Initialize command processor
         self.commands = CommandProcessor(self.state, self.io)
@@ -82,8 +85,9 @@ class Game:
 
             # Show opening scene if new game
             if not self.state.conversation_history:
-                opening_scene = self.llm.generate_opening_scene(self.state)
-                self.io.display_scene(opening_scene)
+                self.io.display_scene_stream(
+                    self.llm.generate_opening_scene_stream(self.state)
+                )
             else:
                 # Show a brief "resume" message
                 self.io.display_info(
@@ -93,17 +97,19 @@ class Game:
                 )
             
             # Main game loop
+            get_input = self.io.get_input
+            process_command = self.commands.process_command
             while True:
                 try:
                     # Get user input
-                    user_input = self.io.get_input()
+                    user_input = get_input()
                     
                     if not user_input:
                         continue
                     
                     # Check if it's a command
-                    if self.commands.is_command(user_input):
-                        handled, should_exit = self.commands.process_command(user_input)
+                    if user_input[:1] == '/':
+                        handled, should_exit = process_command(user_input)
                         if should_exit:
                             break
                         if handled:
@@ -111,8 +117,9 @@ class Game:
                     
                     # Process as game action
                     try:
-                        scene_response = self.llm.generate_scene(user_input, self.state)
-                        self.io.display_scene(scene_response)
+                        self.io.display_scene_stream(
+                            self.llm.generate_scene_stream(user_input, self.state)
+                        )
                         
                     except Exception as e:
                         if self.config.debug:
@@ -133,3 +140,6 @@ class Game:
                 raise
             self.io.display_error(f"Game error: {e}")
             return 1
+        
+        finally:
+            self.state.flush()
@@ -1,5 +1,11 @@
+from bisect import bisect_right
+from itertools import accumulate
+
 from sorcery import prompts
 
+# Section headers used when flattening the story for the summarizer
+_ROLE_HDR = {"user": "# Player\n", "assistant": "# Narrator\n"}
+
 class StorySummary:
     def __init__(self, model=None, max_tokens=1024):
         if not model:
@@ -7,25 +13,47 @@ class StorySummary:
         self.model = model
         self.max_tokens = max_tokens
         self.token_count = self.model.token_count
+        # Model input limit (fallback to 4096 if undefined), less a 512 token
+        # safety buffer
+        self._effective_max_input = max(
+            512, (self.model.info.get("max_input_tokens") or 4096) - 512
+        )
 
     def too_big(self, messages):
-        sized = self.tokenize(messages)
-        total = sum(tokens for tokens, _msg in sized)
-        return total > self.max_tokens
+        # Stop as soon as the limit is crossed rather than sizing everything
+        total = 0
+        for msg in messages:
+            total += self.message_tokens(msg)
+            if total > self.max_tokens:
+                return True
+        return False
+
+    def message_tokens(self, msg):
+        # Model.token_count memoizes per message by content digest, so
+        # repeated sizing (too_big, recursive summaries) doesn't retokenize
+        return self.token_count([msg])
 
     def tokenize(self, messages):
-        sized = []
-        for msg in messages:
-            tokens = self.token_count([msg])
-            sized.append((tokens, msg))
-        return sized
+        message_tokens = self.message_tokens
+        return [(message_tokens(msg), msg) for msg in messages]
+
+    def summarize_if_needed(self, messages):
+        """Summarize messages only if they exceed max_tokens, sizing them once."""
+        sized = self.tokenize(messages)
+        if sum(tokens for tokens, _ in sized) <= self.max_tokens:
+            return messages
+        return self._summarize_with_sized(messages, sized, 0)
 
     def summarize(self, messages, depth=0):
+        return self._summarize_with_sized(messages, self.tokenize(messages), depth)
+
+    def _summarize_with_sized(self, messages, sized, depth):
         if not self.model:
             raise ValueError("No models available for summarization")
 
-        sized = self.tokenize(messages)
-        total = sum(tokens for tokens, _ in sized)
+        # prefix[i] is the token total of messages[:i]
+        prefix = list(accumulate((tokens for tokens, _ in sized), initial=0))
+        total = prefix[-1]
         if total <= self.max_tokens and depth == 0:
             return messages
         
@@ -33,22 +61,17 @@ class StorySummary:
         if len(messages) <= min_split or depth > 3:
             return self.summarize_all(messages)
 
-        tail_tokens = 0
-        split_index = len(messages)
         half_max_tokens = self.max_tokens // 2
 
-        # Iterate over the messages in reverse order
-        for i in range(len(sized) - 1, -1, -1):
-            tokens, _msg = sized[i]
-            if tail_tokens + tokens < half_max_tokens:
-                tail_tokens += tokens
-                split_index = i
-            else:
-                break
+        # Longest tail whose tokens stay under half the budget, i.e. the first
+        # index where total - prefix[i] < half_max_tokens
+        split_index = min(len(messages), bisect_right(prefix, total - half_max_tokens))
 
-        # Ensure the head ends with a scene followed by user response
-        while messages[split_index - 1]["role"] != "user" and split_index > 1:
-            split_index -= 1
+        # Ensure the head ends with a scene followed by user response, by
+        # moving the split to just after the last user message before it
+        user_indices = [i for i, (_, msg) in enumerate(sized) if msg["role"] == "user"]
+        j = bisect_right(user_indices, split_index - 1) - 1
+        split_index = user_indices[j] + 1 if j >= 0 else 1
 
         if split_index <= min_split:
             return self.summarize_all(messages)
@@ -56,48 +79,36 @@ class StorySummary:
         # Split head and tail
         tail = messages[split_index:]
 
-        # Only size the head once
-        sized_head = sized[:split_index]
-
-        # Precompute token limit (fallback to 4096 if undefined)
-        model_max_input_tokens = self.model.info.get("max_input_tokens") or 4096
-        model_max_input_tokens -= 512  # reserve buffer for safety
-
-        keep = []
-        total = 0
-
-        # Iterate in original order, summing tokens until limit
-        for tokens, msg in sized_head:
-            total += tokens
-            if total > model_max_input_tokens:
-                break
-            keep.append(msg)
-        # No need to reverse lists back and forth
+        # Keep the longest head prefix that fits the model input limit
+        keep_index = min(split_index, bisect_right(prefix, self._effective_max_input) - 1)
+        keep = messages[:keep_index]
 
         summary = self.summarize_all(keep)
 
         # If the combined summary and tail still fits, return directly
-        summary_tokens = self.token_count(summary)
-        tail_tokens = sum(tokens for tokens, _ in sized[split_index:])
+        sized_summary = self.tokenize(summary)
+        summary_tokens = sum(tokens for tokens, _ in sized_summary)
+        tail_tokens = total - prefix[split_index]
         if summary_tokens + tail_tokens < self.max_tokens:
             return summary + tail
 
-        # Otherwise recurse with increased depth
-        return self.summarize(summary + tail, depth + 1)
+        # Otherwise recurse with increased depth, reusing the known sizes
+        return self._summarize_with_sized(
+            summary + tail, sized_summary + sized[split_index:], depth + 1
+        )
 
     def summarize_all(self, messages):
-        content = ""
+        parts = []
         for msg in messages:
-            role = msg["role"].upper()
-            if role not in ("USER", "ASSISTANT"):
+            hdr = _ROLE_HDR.get(msg["role"].lower())
+            if hdr is None:
                 continue
-            if role == "USER":
-                content += "# Player\n"
-            else:
-                content += "# Narrator\n"
-            content += msg["content"]
-            if not content.endswith("\n"):
-                content += "\n"
+            parts.append(hdr)
+            text = msg["content"]
+            parts.append(text)
+            if text and not text.endswith("\n"):
+                parts.append("\n")
+        content = "".join(parts)
 
         summarize_messages = [
             dict(role="system", content=prompts.summarize),
@@ -2,9 +2,9 @@
 
 import os
 import sys
-from typing import Optional, List, Dict, Any
+from bisect import bisect_left
+from typing import Optional, List, Dict, Any, Iterable
 
-from prompt_toolkit import prompt
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.formatted_text import HTML
 from prompt_toolkit.history import FileHistory
@@ -12,32 +12,59 @@ from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.shortcuts import PromptSession
 from prompt_toolkit.styles import Style
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
 
+_HELP_TEXT = """Available commands:
+
+Game Commands:
+  /help, /h          Show this help message
+  /save              Save the current game
+  /stats             Show player statistics  
+  /inventory, /inv   Show inventory
+  /look              Look around current location
+  /map               Show visited locations
+  /exit, /quit       Exit the game
+
+During gameplay, simply type your actions in natural language.
+The AI will respond with what happens next in your adventure!
+
+Examples:
+  > go north
+  > talk to the merchant
+  > pick up the sword
+  > cast a fireball at the dragon
+"""
+
 
 class SorceryCompleter(Completer):
     """Auto-completer for Sorcery commands."""
     
     def __init__(self):
-        self.commands = [
+        # Sorted so matches for a prefix form one contiguous run
+        self.commands = sorted([
             "/help", "/exit", "/quit", "/save", "/stats", 
             "/inventory", "/inv", "/look", "/map"
-        ]
+        ])
+        self._lower = [cmd.lower() for cmd in self.commands]
     
     def get_completions(self, document, complete_event):
         """Generate completions for the current input."""
-        text = document.text_before_cursor
+        text = document.text_before_cursor.lower()
+        if not text.startswith('/'):
+            return
         
-        if text.startswith('/'):
-            for cmd in self.commands:
-                if cmd.startswith(text.lower()):
-                    yield Completion(
-                        cmd,
-                        start_position=-len(text),
-                        display=cmd,
-                        display_meta=f"Command: {cmd}"
-                    )
+        for i in range(bisect_left(self._lower, text), len(self._lower)):
+            if not self._lower[i].startswith(text):
+                break
+            cmd = self.commands[i]
+            yield Completion(
+                cmd,
+                start_position=-len(text),
+                display=cmd,
+                display_meta=f"Command: {cmd}"
+            )
 
 
 class InputOutput:
@@ -71,6 +98,19 @@ class InputOutput:
         
         # Key bindings
         self.bindings = KeyBindings()
+        
+        # Constant panel options, reused by every display call
+        self._scene_kw = dict(title="[bold cyan]Scene[/bold cyan]", border_style="cyan", padding=(1, 2))
+        self._info_kw = dict(border_style="blue", padding=(1, 2))
+        self._question_kw = dict(border_style="purple", padding=(1, 2))
+        self._error_kw = dict(title="[bold red]Error[/bold red]", border_style="red", padding=(1, 2))
+        self._saved_kw = dict(title="[bold green]Saved[/bold green]", border_style="green", padding=(1, 2))
+        
+        # Panels with constant content are only built once
+        self._welcome_panel = None
+        self._goodbye_panel = None
+        if self.pretty:
+            self._build_static_panels()
     
     def _get_style(self) -> Style:
         """Get the prompt toolkit style."""
@@ -86,22 +126,38 @@ class InputOutput:
             'scrollbar.button': 'bg:#222222',
         })
     
+    def _build_static_panels(self) -> None:
+        """Build the welcome and goodbye panels."""
+        welcome_text = Text()
+        welcome_text.append("🪄 Welcome to ", style="bold blue")
+        welcome_text.append("SORCERY", style="bold magenta")
+        welcome_text.append(" 🪄", style="bold blue")
+        welcome_text.append("\nA CLI-based text adventure powered by LLMs\n", style="dim")
+        
+        self._welcome_panel = Panel(
+            welcome_text,
+            title="[bold green]Game Starting[/bold green]",
+            border_style="blue",
+            padding=(1, 2)
+        )
+        
+        goodbye_text = Text()
+        goodbye_text.append("Thanks for playing ", style="bold blue")
+        goodbye_text.append("SORCERY", style="bold magenta")
+        goodbye_text.append("! 🌟", style="bold blue")
+        goodbye_text.append("\nYour adventure awaits your return...", style="dim")
+        
+        self._goodbye_panel = Panel(
+            goodbye_text,
+            title="[bold yellow]Farewell[/bold yellow]",
+            border_style="yellow",
+            padding=(1, 2)
+        )
+    
     def display_welcome(self) -> None:
         """Display the welcome message."""
         if self.pretty:
-            welcome_text = Text()
-            welcome_text.append("🪄 Welcome to ", style="bold blue")
-            welcome_text.append("SORCERY", style="bold magenta")
-            welcome_text.append(" 🪄", style="bold blue")
-            welcome_text.append("\nA CLI-based text adventure powered by LLMs\n", style="dim")
-            
-            panel = Panel(
-                welcome_text,
-                title="[bold green]Game Starting[/bold green]",
-                border_style="blue",
-                padding=(1, 2)
-            )
-            self.console.print(panel)
+            self.console.print(self._welcome_panel)
         else:
             self.console.print("=== SORCERY ===")
             self.console.print("A CLI-based text adventure powered by LLMs")
@@ -110,28 +166,42 @@ class InputOutput:
     def display_scene(self, content: str) -> None:
         """Display a game scene."""
         if self.pretty:
-            panel = Panel(
-                content,
-                title="[bold cyan]Scene[/bold cyan]",
-                border_style="cyan",
-                padding=(1, 2)
-            )
-            self.console.print(panel)
+            self.console.print(Panel(content, **self._scene_kw))
         else:
             self.console.print(f"\n--- Scene ---")
             self.console.print(content)
             self.console.print("-------------\n")
     
+    def display_scene_stream(self, deltas: Iterable[str]) -> str:
+        """Display a game scene as it streams in. Returns the full text."""
+        parts = []
+        if self.pretty:
+            text = Text()
+            panel = Panel(text, **self._scene_kw)
+            with Live(
+                panel,
+                console=self.console,
+                refresh_per_second=12,
+                vertical_overflow="visible",
+            ):
+                for delta in deltas:
+                    parts.append(delta)
+                    text.append(delta)
+        else:
+            self.console.print(f"\n--- Scene ---")
+            for delta in deltas:
+                parts.append(delta)
+                self.console.print(delta, end="", markup=False, highlight=False)
+            self.console.print()
+            self.console.print("-------------\n")
+        return "".join(parts)
+    
     def display_info(self, message: str, title: str = "Info") -> None:
         """Display an info message."""
         if self.pretty:
-            panel = Panel(
-                message,
-                title=f"[bold blue]{title}[/bold blue]",
-                border_style="blue",
-                padding=(1, 2)
+            self.console.print(
+                Panel(message, title=f"[bold blue]{title}[/bold blue]", **self._info_kw)
             )
-            self.console.print(panel)
         else:
             self.console.print(f"\n--- {title} ---")
             self.console.print(message)
@@ -140,13 +210,9 @@ class InputOutput:
     def display_question(self, question: str, title: str = "Question") -> None:
         """Display an question."""
         if self.pretty:
-            panel = Panel(
-                question,
-                title=f"[bold purple]{title}[/bold purple]",
-                border_style="purple",
-                padding=(1, 2)
+            self.console.print(
+                Panel(question, title=f"[bold purple]{title}[/bold purple]", **self._question_kw)
             )
-            self.console.print(panel)
         else:
             self.console.print(f"\n--- {title} ---")
             self.console.print(message)
@@ -155,39 +221,13 @@ class InputOutput:
     def display_error(self, message: str) -> None:
         """Display an error message."""
         if self.pretty:
-            panel = Panel(
-                message,
-                title="[bold red]Error[/bold red]",
-                border_style="red",
-                padding=(1, 2)
-            )
-            self.console.print(panel)
+            self.console.print(Panel(message, **self._error_kw))
         else:
             self.console.print(f"ERROR: {message}")
     
     def display_help(self) -> None:
         """Display help information."""
-        help_text = """Available commands:
-
-Game Commands:
-  /help, /h          Show this help message
-  /save              Save the current game
-  /stats             Show player statistics  
-  /inventory, /inv   Show inventory
-  /look              Look around current location
-  /map               Show visited locations
-  /exit, /quit       Exit the game
-
-During gameplay, simply type your actions in natural language.
-The AI will respond with what happens next in your adventure!
-
-Examples:
-  > go north
-  > talk to the merchant
-  > pick up the sword
-  > cast a fireball at the dragon
-"""
-        self.display_info(help_text, "Help")
+        self.display_info(_HELP_TEXT, "Help")
     
     def get_input(self, prompt_text: str = "> ") -> str:
         """Get input from the user with the beautiful prompt box."""
@@ -228,32 +268,14 @@ Examples:
         """Display save confirmation."""
         if self.pretty:
             message = f"✅ Game saved successfully to:\n[dim]{filepath}[/dim]"
-            panel = Panel(
-                message,
-                title="[bold green]Saved[/bold green]",
-                border_style="green",
-                padding=(1, 2)
-            )
-            self.console.print(panel)
+            self.console.print(Panel(message, **self._saved_kw))
         else:
             self.console.print(f"Game saved to: {filepath}")
     
     def display_goodbye(self) -> None:
         """Display goodbye message."""
         if self.pretty:
-            goodbye_text = Text()
-            goodbye_text.append("Thanks for playing ", style="bold blue")
-            goodbye_text.append("SORCERY", style="bold magenta")
-            goodbye_text.append("! 🌟", style="bold blue")
-            goodbye_text.append("\nYour adventure awaits your return...", style="dim")
-            
-            panel = Panel(
-                goodbye_text,
-                title="[bold yellow]Farewell[/bold yellow]",
-                border_style="yellow",
-                padding=(1, 2)
-            )
-            self.console.print(panel)
+            self.console.print(self._goodbye_panel)
         else:
             self.console.print("Thanks for playing SORCERY!")
             self.console.print("Your adventure awaits your return...")
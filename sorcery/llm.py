@@ -1,23 +1,61 @@
 """LLM integration for Sorcery game."""
-import litellm
+import functools
+import hashlib
+import json
 import os
+import queue
+import random
+import re
 import threading
 import time
 import traceback
-from typing import Optional, Dict, Any, List
-from abc import ABC, abstractmethod
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Optional, Dict, List
 
-from litellm.litellm_core_utils.prompt_templates.factory import get_system_prompt
+from .config import sorcery_dir
 from .history import StorySummary
 from .input_output import InputOutput
 from .state import GameState
 from .chat_chunks import ChatChunks
 
 RETRY_TIMEOUT = 60
+# Non-streaming timeouts adapt to the model's observed latency within these
+# bounds; the upper one applies until a latency has been measured
 request_timeout = 600
+MIN_REQUEST_TIMEOUT = 60
+# Streams are abandoned if no chunk arrives for this many seconds. Reasoning
+# models (o1, o3-mini) can think for minutes before their first chunk.
+STREAM_TIMEOUT = 600
+LATENCY_EMA_ALPHA = 0.3
+
+# Errors that make StoryTeller move on to its next fallback model
+FALLBACK_ERRORS = frozenset({
+    "APIConnectionError",
+    "InternalServerError",
+    "RateLimitError",
+    "ServiceUnavailableError",
+    "Timeout",
+})
+# A model is skipped for BREAKER_COOLDOWN seconds after this many failures
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60
+MODEL_INFO_TTL = 7 * 24 * 60 * 60  # seconds before cached model info is refetched
+MODEL_INFO_TIMEOUT = (1.5, 3.5)  # (connect, read) seconds for openrouter lookups
+RESPONSE_CACHE_SIZE = 128  # deterministic non-streamed responses kept per model
 
 DEFAULT_MODEL_NAME = "gpt-4o"
 
+# Approximate chat format overhead, following OpenAI's accounting: each
+# message costs a few tokens for its role and delimiters, and every request
+# is primed with a few more for the reply.
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+# Conservative characters-per-token ratio for the cheap pre-check in
+# check_tokens; real text averages closer to 4
+APPROX_CHARS_PER_TOKEN = 3
+
 # Mapping of model aliases to their canonical names
 MODEL_ALIASES = {
     # Claude models
@@ -44,87 +82,162 @@ MODEL_ALIASES = {
     # "optimus": "openrouter/openrouter/optimus-alpha",
 }
 
-OPENAI_MODELS = """
-o1
-o1-preview
-o1-mini
-o3-mini
-gpt-4
-gpt-4o
-gpt-4o-2024-05-13
-gpt-4-turbo-preview
-gpt-4-0314
-gpt-4-0613
-gpt-4-32k
-gpt-4-32k-0314
-gpt-4-32k-0613
-gpt-4-turbo
-gpt-4-turbo-2024-04-09
-gpt-4-1106-preview
-gpt-4-0125-preview
-gpt-4-vision-preview
-gpt-4-1106-vision-preview
-gpt-4o-mini
-gpt-4o-mini-2024-07-18
-gpt-3.5-turbo
-gpt-3.5-turbo-0301
-gpt-3.5-turbo-0613
-gpt-3.5-turbo-1106
-gpt-3.5-turbo-0125
-gpt-3.5-turbo-16k
-gpt-3.5-turbo-16k-0613
-"""
-
-OPENAI_MODELS = [ln.strip() for ln in OPENAI_MODELS.splitlines() if ln.strip()]
-
-ANTHROPIC_MODELS = """
-claude-2
-claude-2.1
-claude-3-haiku-20240307
-claude-3-5-haiku-20241022
-claude-3-opus-20240229
-claude-3-sonnet-20240229
-claude-3-5-sonnet-20240620
-claude-3-5-sonnet-20241022
-claude-sonnet-4-20250514
-claude-opus-4-20250514
-"""
-
-ANTHROPIC_MODELS = [ln.strip() for ln in ANTHROPIC_MODELS.splitlines() if ln.strip()]
+OPENAI_MODELS = frozenset({
+    "o1",
+    "o1-preview",
+    "o1-mini",
+    "o3-mini",
+    "gpt-4",
+    "gpt-4o",
+    "gpt-4o-2024-05-13",
+    "gpt-4-turbo-preview",
+    "gpt-4-0314",
+    "gpt-4-0613",
+    "gpt-4-32k",
+    "gpt-4-32k-0314",
+    "gpt-4-32k-0613",
+    "gpt-4-turbo",
+    "gpt-4-turbo-2024-04-09",
+    "gpt-4-1106-preview",
+    "gpt-4-0125-preview",
+    "gpt-4-vision-preview",
+    "gpt-4-1106-vision-preview",
+    "gpt-4o-mini",
+    "gpt-4o-mini-2024-07-18",
+    "gpt-3.5-turbo",
+    "gpt-3.5-turbo-0301",
+    "gpt-3.5-turbo-0613",
+    "gpt-3.5-turbo-1106",
+    "gpt-3.5-turbo-0125",
+    "gpt-3.5-turbo-16k",
+    "gpt-3.5-turbo-16k-0613",
+})
+
+ANTHROPIC_MODELS = frozenset({
+    "claude-2",
+    "claude-2.1",
+    "claude-3-haiku-20240307",
+    "claude-3-5-haiku-20241022",
+    "claude-3-opus-20240229",
+    "claude-3-sonnet-20240229",
+    "claude-3-5-sonnet-20240620",
+    "claude-3-5-sonnet-20241022",
+    "claude-sonnet-4-20250514",
+    "claude-opus-4-20250514",
+})
+
+# Provider of each known model, so one lookup answers both membership and
+# provider questions
+_MODEL_TO_PROVIDER = {model: "openai" for model in OPENAI_MODELS}
+_MODEL_TO_PROVIDER.update({model: "anthropic" for model in ANTHROPIC_MODELS})
+
+_PROVIDER_API_KEYS = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
 
+@functools.lru_cache(maxsize=32)
 def get_model_info(model) -> Dict[str, str]:
+    """Get model token limits and costs.
+
+    litellm's bundled model table is used when it knows the model. Otherwise
+    the info is scraped from openrouter and cached on disk in
+    ~/.sorcery/model_info.json for MODEL_INFO_TTL seconds. Results are also
+    cached in memory for the rest of the process."""
+    params = _litellm_model_info(model)
+    if params:
+        return params
+
+    cache_file = sorcery_dir() / "model_info.json"
+    try:
+        with open(cache_file, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    entry = cache.get(model)
+    if entry and time.time() - entry.get("fetched_at", 0) < MODEL_INFO_TTL:
+        return entry["params"]
+
+    params = _fetch_model_info(model)
+    if params:
+        cache[model] = {"params": params, "fetched_at": time.time()}
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump(cache, f, indent=2)
+        except OSError:
+            pass
+    return params
+
+def _litellm_model_info(model) -> Dict[str, str]:
+    """Look up model info in litellm's model cost table."""
+    import litellm
+
+    entry = litellm.model_cost.get(model) or {}
+    context_size = entry.get("max_input_tokens")
+    input_cost = entry.get("input_cost_per_token")
+    output_cost = entry.get("output_cost_per_token")
+    if context_size is None or input_cost is None or output_cost is None:
+        return {}
+    return {
+        "max_input_tokens": context_size,
+        "max_tokens": entry.get("max_tokens") or context_size,
+        "max_output_tokens": entry.get("max_output_tokens") or context_size,
+        "input_cost_per_token": input_cost,
+        "output_cost_per_token": output_cost,
+    }
+
+# Patterns for scraping model info from openrouter model pages
+_TAG_RE = re.compile(r"<[^>]+>")
+_CONTEXT_RE = re.compile(r"([\d,]+)\s*context")
+_INPUT_COST_RE = re.compile(r"\$\s*([\d.]+)\s*/M input tokens", re.IGNORECASE)
+_OUTPUT_COST_RE = re.compile(r"\$\s*([\d.]+)\s*/M output tokens", re.IGNORECASE)
+_UNAVAILABLE_RE = re.compile(r"The model\s*.* is not available", re.IGNORECASE)
+
+_http_session = None
+
+def _get_http_session():
+    """Shared keep-alive HTTP session, created on first use."""
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        _http_session = requests.Session()
+        _http_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+    return _http_session
+
+def _fetch_model_info(model) -> Dict[str, str]:
     """Helper function to fetch max tokens, max input and output tokens
     from openrouter."""
-    if model in OPENAI_MODELS:
-        url_part = 'openai/' + model
-    elif model in ANTHROPIC_MODELS:
-        url_part = 'anthropic/' + model
-    else:
+    provider = _MODEL_TO_PROVIDER.get(model)
+    if provider is None:
         raise ValueError('Model not recognized')
+    url_part = provider + '/' + model
+
+    import requests
 
     url = "https://openrouter.ai/" + url_part
     try:
-        import requests
-        response = requests.get(url, timeout=5, verify=True)
+        response = _get_http_session().get(
+            url, timeout=MODEL_INFO_TIMEOUT, verify=True, allow_redirects=False
+        )
         if response.status_code != 200:
             return {}
         html = response.text
-        import re
 
-        if re.search(
-            rf"The model\s*.*{re.escape(url_part)}.* is not available", html, re.IGNORECASE
-        ):
+        if any(url_part in match.group(0) for match in _UNAVAILABLE_RE.finditer(html)):
             print(f"\033[91mError: Model '{url_part}' is not available\033[0m")
             return {}
-        text = re.sub(r"<[^>]+>", " ", html)
-        context_match = re.search(r"([\d,]+)\s*context", text)
+        text = _TAG_RE.sub(" ", html)
+        context_match = _CONTEXT_RE.search(text)
         if context_match:
             context_str = context_match.group(1).replace(",", "")
             context_size = int(context_str)
         else:
             context_size = None
-        input_cost_match = re.search(r"\$\s*([\d.]+)\s*/M input tokens", text, re.IGNORECASE)
-        output_cost_match = re.search(r"\$\s*([\d.]+)\s*/M output tokens", text, re.IGNORECASE)
+        input_cost_match = _INPUT_COST_RE.search(text)
+        output_cost_match = _OUTPUT_COST_RE.search(text)
         input_cost = float(input_cost_match.group(1)) / 1000000 if input_cost_match else None
         output_cost = float(output_cost_match.group(1)) / 1000000 if output_cost_match else None
         if context_size is None or input_cost is None or output_cost is None:
@@ -137,23 +250,16 @@ def get_model_info(model) -> Dict[str, str]:
             "output_cost_per_token": output_cost,
         }
         return params
+    except requests.exceptions.ConnectTimeout:
+        # unreachable, most likely offline; don't hold up startup
+        return {}
     except Exception as e:
         print("Error fetching openrouter info:", str(e))
         return {}
 
-def _build_system_prompt(game_state: GameState) -> str:
-    """Build the system prompt with game context."""
-    return f"""You are the narrator of SORCERY, a text-based RPG adventure game.
-
-Current Game Context:
-- Player Name: {game_state.player_name}
-- Location: {game_state.current_location}
-
-{game_state.get_stats_summary()}
-
-Recent Events: {[event.description for event in game_state.get_recent_events(3)]}
-
-Inventory: {list(game_state.items.keys()) if game_state.items else "Empty"}
+# The static part of the system prompt is kept byte-identical across turns so
+# providers can cache it. Per-turn game state goes in a separate message.
+_STATIC_SYSTEM_PROMPT = """You are the narrator of SORCERY, a text-based RPG adventure game.
 
 Instructions:
 1. Generate vivid, immersive narrative responses to player actions
@@ -167,6 +273,44 @@ Instructions:
 
 The player will describe their action, and you should respond with what happens next in the story. The scene you write should flow naturally from the previous scene, as if the story simply flipped to the next page. Focus on consistency: for example, if the character in the last scene was holding a sword, he/she should not suddenly be holding a bow in the following scene. Same goes with descriptions of the environment or characters unless introducing information not previously established."""
 
+def _approx_tokens(messages) -> int:
+    """Rough token estimate from message lengths, without tokenizing."""
+    chars = 0
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+        elif content:
+            # content blocks, e.g. a cached system prompt
+            chars += sum(len(block.get("text") or "") for block in content)
+    return chars // APPROX_CHARS_PER_TOKEN + TOKENS_PER_MESSAGE * len(messages)
+
+def _build_context_prompt(game_state: GameState) -> str:
+    """Build the per-turn game context prompt."""
+    recent_events = "; ".join(event.description for event in game_state.get_recent_events(3))
+    parts = [
+        "Current Game Context:",
+        f"- Player Name: {game_state.player_name}",
+        f"- Location: {game_state.current_location}",
+        "",
+        game_state.get_stats_summary(),
+        "",
+        f"Recent Events: {recent_events or 'None'}",
+        "",
+        f"Inventory: {', '.join(game_state.items) or 'Empty'}",
+    ]
+    return "\n".join(parts)
+
+def _with_cache_breakpoint(message):
+    """Copy of message with an Anthropic prompt cache breakpoint on it."""
+    content = message["content"]
+    if isinstance(content, str):
+        content = [dict(type="text", text=content)]
+    else:
+        content = [dict(block) for block in content]
+    content[-1]["cache_control"] = {"type": "ephemeral"}
+    return dict(message, content=content)
+
 class Model():
     def __init__(self, model_name):
         # map alias to canonical model name
@@ -184,32 +328,79 @@ class Model():
         if self.api_key is None:
             raise ValueError("No API key found in environment.")
 
+        # per-message token counts keyed by (role, content digest)
+        self._tok_cache: Dict[tuple, int] = {}
+        # local tiktoken encoder, resolved on first use (False if unavailable)
+        self._enc = None
+
+        # non-streamed responses to repeated low temperature requests, LRU
+        self._resp_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+        self._resp_lock = threading.Lock()
+
+        # moving average of successful request latency, in seconds
+        self._ema_latency: Optional[float] = None
+
     def validate_model_name(self, model_name):
-        if model_name not in OPENAI_MODELS and model_name not in ANTHROPIC_MODELS:
-            return False
-        return True
+        return model_name in _MODEL_TO_PROVIDER
 
     def validate_environment(self):
         """Validate and fetch API key in environment."""
-        var = None
-        if self.name and self.name in OPENAI_MODELS:
-            var = "OPENAI_API_KEY"
-        elif self.name and self.name in ANTHROPIC_MODELS:
-            var = "ANTHROPIC_API_KEY"
+        var = _PROVIDER_API_KEYS.get(_MODEL_TO_PROVIDER.get(self.name))
 
         if var and os.environ.get(var):
             return var
         else:
             return None
 
+    def _encoder(self):
+        """tiktoken encoder for OpenAI models, or False when tokenization
+        has to go through litellm."""
+        if self._enc is None:
+            self._enc = False
+            if _MODEL_TO_PROVIDER.get(self.name) == "openai":
+                try:
+                    import tiktoken
+
+                    try:
+                        self._enc = tiktoken.encoding_for_model(self.name)
+                    except KeyError:
+                        self._enc = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    # not installed, or the BPE file could not be fetched
+                    self._enc = False
+        return self._enc
+
     def tokenizer(self, text):
+        enc = self._encoder()
+        if enc:
+            return enc.encode(text, disallowed_special=())
+
+        import litellm
+
         return litellm.encode(model=self.name, text=text)
 
+    def _count_one(self, message):
+        """Count tokens of a single message, memoized by content so history
+        is only tokenized once."""
+        content = message.get("content")
+        if not isinstance(content, str):
+            # structured content (e.g. cache_control blocks) is left to litellm
+            import litellm
+
+            return litellm.token_counter(model=self.name, messages=[message]) - TOKENS_PER_REPLY
+
+        digest = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        key = (message.get("role"), digest)
+        count = self._tok_cache.get(key)
+        if count is None:
+            count = len(self.tokenizer(content)) + TOKENS_PER_MESSAGE
+            self._tok_cache[key] = count
+        return count
+
     def token_count(self, messages):
         if type(messages) is list:
             try:
-                count = litellm.token_counter(model=self.name, messages=messages)
-                return count
+                return sum(self._count_one(msg) for msg in messages) + TOKENS_PER_REPLY
             except Exception as err:
                 return 0
         
@@ -224,18 +415,58 @@ class Model():
             raise ValueError(f"Unexpected type for messages: {type(messages)}")
 
     def send_completion(self, messages, stream, temperature=None):
-        """Note: can explore having streaming instead one shot generated response
-        for better experience."""
+        """Send a completion request. With stream=True the result is an
+        iterator of response chunks."""
+        import litellm
+
         kwargs = dict(
             model=self.name,
             stream=stream,
             messages=messages,
-            timeout=request_timeout
+            timeout=STREAM_TIMEOUT if stream else self.request_timeout(),
         )
-
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+
+        cache_key = None
+        if not stream and not temperature:
+            cache_key = self._response_key(messages, temperature)
+            with self._resp_lock:
+                cached = self._resp_cache.get(cache_key)
+                if cached is not None:
+                    self._resp_cache.move_to_end(cache_key)
+                    return cached
+
+        start = time.monotonic()
         result = litellm.completion(**kwargs)
+        if not stream:
+            # streamed calls return before generation finishes, so only full
+            # responses feed the latency estimate
+            self._record_latency(time.monotonic() - start)
+
+        if cache_key is not None:
+            with self._resp_lock:
+                self._resp_cache[cache_key] = result
+                if len(self._resp_cache) > RESPONSE_CACHE_SIZE:
+                    self._resp_cache.popitem(last=False)
         return result
 
+    def _response_key(self, messages, temperature):
+        payload = json.dumps((self.name, temperature, messages), sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    def request_timeout(self):
+        """Timeout for a non-streaming request, 3x the typical latency."""
+        if self._ema_latency is None:
+            return request_timeout
+        return min(request_timeout, max(MIN_REQUEST_TIMEOUT, 3 * self._ema_latency))
+
+    def _record_latency(self, latency):
+        if self._ema_latency is None:
+            self._ema_latency = latency
+        else:
+            self._ema_latency += LATENCY_EMA_ALPHA * (latency - self._ema_latency)
+
     def simple_send_with_retries(self, messages):
         from .exceptions import LiteLLMExceptions
 
@@ -267,7 +498,7 @@ class Model():
                         should_retry = False
                 if not should_retry:
                     return None
-                time.sleep(retry_delay)
+                time.sleep(retry_delay * (0.5 + random.random()))  # jitter
                 continue
             except Exception as err:
                 raise err
@@ -276,19 +507,47 @@ class Model():
 class StoryTeller:
     """Manages LLMs and handles scene generation."""
     
-    def __init__(self, io: InputOutput, model: str = "gpt-4o-mini"):
+    def __init__(
+        self,
+        io: InputOutput,
+        model: str = "gpt-4o-mini",
+        fallback_models: Optional[List[str]] = None,
+    ):
         # IO
         self.io = io
 
         # Initialize model
         self.model = Model(model)
-        
+
+        # Models tried in order when the main model is unavailable; those
+        # without an API key are skipped
+        self.fallback_models = []
+        for name in fallback_models or []:
+            try:
+                fallback = Model(name)
+            except ValueError:
+                continue
+            if fallback.name != self.model.name:
+                self.fallback_models.append(fallback)
+
+        # model name -> (consecutive failures, skip until monotonic time)
+        self._breaker: Dict[str, tuple] = {}
+
         # Initialize summarizer
         self.summarizer = StorySummary(model=self.model) # max_tokens=self.model.max_chat_history_tokens)
-        self.summarizer_thread = None
+        # A single background worker summarizes queued snapshots of
+        # done_messages; results wait in _pending_summary until swapped in.
+        # Only one job is queued or running at a time (_summarizing).
+        self._summary_queue = queue.Queue(maxsize=1)
+        self._summary_lock = threading.Lock()
+        self._summarizing = False
+        self._pending_summary = None
+        self.summarizer_thread = threading.Thread(target=self.summarize_worker, daemon=True)
+        self.summarizer_thread.start()
 
         # Separation of message types
-        self.system_message = []
+        self.system_message = [dict(role="system", content=_STATIC_SYSTEM_PROMPT)]
+        self.context_message = []
         self.done_messages = []
         self.cur_messages = []
 
@@ -299,44 +558,63 @@ class StoryTeller:
         return self.model
 
     def set_system_prompt(self, state: GameState):
-        """Update the system prompt based on the game state."""
-        self.system_message = [
-            dict(role="system", content=_build_system_prompt(state))
+        """Update the game context sent with the next message.
+
+        The system prompt itself never changes. The per-turn context is sent
+        as a trailing message, after the history, so the system prompt plus
+        the past scenes form a prefix that stays identical between turns and
+        can be cached by the provider."""
+        self.context_message = [
+            dict(role="system", content=_build_context_prompt(state)),
         ]
 
     def summarize_start(self):
-        """Start summarizing process on past messages."""
+        """Queue past messages for summarizing by the background worker."""
         if not self.summarizer.too_big(self.done_messages):
             return
 
-        self.summarize_end()
+        # Each summary is a paid call, so don't start another while one is
+        # running or waiting to be swapped in
+        with self._summary_lock:
+            if self._summarizing or self._pending_summary is not None:
+                return
+            self._summarizing = True
 
-        # start summarizing
-        self.summarizer_thread = threading.Thread(target=self.summarize_worker)
-        self.summarizer_thread.start()
+        # the worker summarizes done_messages up to this length
+        self._summary_queue.put_nowait((self.done_messages, len(self.done_messages)))
 
     def summarize_worker(self):
-        self.summarizing_messages = list(self.done_messages)
-        try:
-            self.summarized_done_messages = self.summarizer.summarize(self.summarizing_messages)
-        except ValueError as err:
-            self.io.display_error(err.args[0])
-        except Exception as err:
-            self.io.display_error(f"Summarization error: {err}")
+        """Summarize queued message snapshots for the life of the process."""
+        while True:
+            messages, end = self._summary_queue.get()
+            summary = None
+            try:
+                # skip snapshots of a history that has since been replaced
+                if messages is self.done_messages:
+                    summary = self.summarizer.summarize_if_needed(messages[:end])
+            except ValueError as err:
+                self.io.display_error(err.args[0])
+            except Exception as err:
+                self.io.display_error(f"Summarization error: {err}")
+
+            with self._summary_lock:
+                if summary is not None:
+                    self._pending_summary = (messages, end, summary)
+                self._summarizing = False
 
     def summarize_end(self):
-        if self.summarizer_thread is None:
+        """Swap in a finished summary, if any, without waiting for one."""
+        with self._summary_lock:
+            pending = self._pending_summary
+            self._pending_summary = None
+        if pending is None:
             return
 
-        self.summarizer_thread.join() 
-        self.summarizer_thread = None
-
-        # if new user messages added to history, discard summary
-        if self.summarizing_messages == self.done_messages:
-            self.done_messages = self.summarized_done_messages
-        
-        self.summarizing_messages = None
-        self.summarized_done_messages = []
+        messages, end, summary = pending
+        # discard summaries of a history that has since been replaced; keep
+        # any messages appended after the snapshot was taken
+        if messages is self.done_messages:
+            self.done_messages = summary + self.done_messages[end:]
 
     def move_back_cur_messages(self):
         self.done_messages += self.cur_messages
@@ -350,14 +628,27 @@ class StoryTeller:
         
         # summarizer call
         self.summarize_end()
-        chunks.past_scenes = self.done_messages
+        past_scenes = self.done_messages
+        if past_scenes and self.model.name in ANTHROPIC_MODELS:
+            # Anthropic only caches up to an explicit breakpoint; put it on
+            # the last stable message. OpenAI caches prefixes automatically.
+            past_scenes = past_scenes[:-1] + [_with_cache_breakpoint(past_scenes[-1])]
+        chunks.past_scenes = past_scenes
         chunks.cur = list(self.cur_messages)
-        chunks.reminder = []
+        chunks.reminder = self.context_message
         
         return chunks
 
     def send_message(self, inp):
-        """Send message to the model for response.
+        """Send message to the model and return the full response."""
+        return "".join(self.send_message_stream(inp))
+
+    def send_message_stream(self, inp):
+        """Send message to the model, returning an iterator over the response
+        text as it arrives.
+
+        The request is prepared (and the token limit confirmed with the user)
+        before this returns, so the caller can start rendering right away.
 
         TODO: figure out what to do with keyboard interrupts"""
         self.cur_messages += [
@@ -369,37 +660,67 @@ class StoryTeller:
 
         # check if fits in token limits
         if not self.check_tokens(messages):
-            return ""
+            return iter(())
+
+        return self._stream_completion(messages)
 
+    def _model_chain(self) -> List[Model]:
+        """Models to try in order, skipping those whose breaker is open."""
+        now = time.monotonic()
+        chain = [
+            model for model in [self.model] + self.fallback_models
+            if self._breaker.get(model.name, (0, 0))[1] <= now
+        ]
+        return chain or [self.model]
+
+    def _record_failure(self, model: Model):
+        failures = self._breaker.get(model.name, (0, 0))[0] + 1
+        open_until = time.monotonic() + BREAKER_COOLDOWN if failures >= BREAKER_THRESHOLD else 0
+        self._breaker[model.name] = (failures, open_until)
+
+    def _stream_completion(self, messages):
         from .exceptions import LiteLLMExceptions
         litellm_ex = LiteLLMExceptions()
         retry_delay = 0.125
-        exhausted = False
 
-        res = None
+        chain = self._model_chain()
+        index = 0
         while True:
+            model = chain[index]
+            received = False
             try:
-                res = self.model.send_completion(messages, False)
-                if not res or not hasattr(res, "choices") or not res.choices:
-                    return ""
-                content = res.choices[0].message.content
-                return content
+                res = model.send_completion(messages, True)
+                for chunk in res:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        received = True
+                        yield delta
+                self._breaker.pop(model.name, None)
+                return
             except litellm_ex.exceptions_tuple() as err:
                 ex_info = litellm_ex.get_ex_info(err)
 
                 if ex_info.name == "ContextWindowExceededError":
-                    exhausted = True
-                    break
-
-                should_retry = ex_info.retry
+                    return
+
+                if not received and ex_info.name in FALLBACK_ERRORS:
+                    self._record_failure(model)
+                    if index + 1 < len(chain):
+                        index += 1
+                        self.io.display_error(
+                            f"{model.name} is unavailable ({ex_info.name}),"
+                            f" falling back to {chain[index].name}."
+                        )
+                        continue
+
+                should_retry = ex_info.retry and not received
                 if should_retry:
                     retry_delay *= 2
                     if retry_delay > RETRY_TIMEOUT:
                         should_retry = False
 
-                if not should_retry:
-                    break
-
                 err_msg = str(err)
                 if ex_info.description:
                     self.io.display_error(err_msg)
@@ -407,21 +728,32 @@ class StoryTeller:
                 else:
                     self.io.display_error(err_msg)
 
-                time.sleep(retry_delay)
+                if not should_retry:
+                    return
+
+                time.sleep(retry_delay * (0.5 + random.random()))  # jitter
                 continue
             except Exception as err:
                 lines = traceback.format_exception(type(err), err, err.__traceback__)
                 self.io.display_error("".join(lines))
                 self.io.display_error(str(err))
-                return ""
+                return
 
+    def _far_below_limit(self, messages):
+        """Cheap check that messages are well inside the input token limit,
+        or that there is no known limit, without counting tokens."""
+        max_input_tokens = self.model.info.get("max_input_tokens") or 0
+        return not max_input_tokens or _approx_tokens(messages) * 2 < max_input_tokens
 
     def check_tokens(self, messages):
         """Check if messages fit inside token limits."""
+        if self._far_below_limit(messages):
+            return True
+
+        max_input_tokens = self.model.info.get("max_input_tokens")
         input_tokens = self.model.token_count(messages)
-        max_input_tokens = self.model.info.get("max_input_tokens") or 0
 
-        if max_input_tokens and input_tokens >= max_input_tokens:
+        if input_tokens >= max_input_tokens:
             self.io.display_error(f"Your estimated chat context of {input_tokens:,} tokens exceeds the"
                                   f" {max_input_tokens:,} token limit for {self.model.name}!")
             if not self.io.confirm("Try to proceed anyways?"):
@@ -430,12 +762,25 @@ class StoryTeller:
 
     def generate_scene(self, user_action: str, game_state: GameState) -> str:
         """Generate a scene response to the user's action."""
+        return "".join(self.generate_scene_stream(user_action, game_state))
+
+    def generate_scene_stream(self, user_action: str, game_state: GameState):
+        """Generate a scene response to the user's action, yielding the text
+        as it streams in. History is updated once the stream is exhausted."""
         self.set_system_prompt(game_state)
         # Build the prompt with user action
         prompt = f"Player action: {user_action}"
-        
+
         # Generate the scene
-        scene_content = self.send_message(prompt)
+        stream = self.send_message_stream(prompt)
+        return self._record_scene(stream, user_action, game_state)
+
+    def _record_scene(self, stream, user_action: str, game_state: GameState):
+        buf = []
+        for delta in stream:
+            buf.append(delta)
+            yield delta
+        scene_content = "".join(buf)
 
         self.move_back_cur_messages()
 
@@ -444,17 +789,21 @@ class StoryTeller:
             dict(role="assistant", content=scene_content)
         ]
 
-        # Add to conversation history
-        game_state.add_conversation("user", user_action)
-        game_state.add_conversation("assistant", scene_content)
+        # Add to conversation history, one timestamp for the whole turn
+        now = datetime.now()
+        game_state.add_conversation("user", user_action, now=now)
+        game_state.add_conversation("assistant", scene_content, now=now)
         
         # Add event to game history
-        game_state.add_event(f"Player: {user_action}")
-        
-        return scene_content
+        game_state.add_event(f"Player: {user_action}", now=now)
     
     def generate_opening_scene(self, game_state: GameState) -> str:
         """Generate the opening scene of the game."""
+        return "".join(self.generate_opening_scene_stream(game_state))
+
+    def generate_opening_scene_stream(self, game_state: GameState):
+        """Generate the opening scene of the game, yielding the text as it
+        streams in."""
         self.set_system_prompt(game_state)
         opening_prompt = (
             "As the narrator, generate an opening scene for a new adventure. "
@@ -462,7 +811,15 @@ class StoryTeller:
             "their first choice of action. Make it engaging and immersive."
         )
         
-        scene_content = self.send_message(opening_prompt)
+        stream = self.send_message_stream(opening_prompt)
+        return self._record_opening_scene(stream, game_state)
+
+    def _record_opening_scene(self, stream, game_state: GameState):
+        buf = []
+        for delta in stream:
+            buf.append(delta)
+            yield delta
+        scene_content = "".join(buf)
 
         # do not move the opening prompt to the past messages for summary
         self.cur_messages = []
@@ -473,11 +830,10 @@ class StoryTeller:
             dict(role="assistant", content=scene_content)
         ]
         
-        # Add to conversation history
-        game_state.add_conversation("system", "Game started")
-        game_state.add_conversation("assistant", scene_content)
+        # Add to conversation history, one timestamp for the whole turn
+        now = datetime.now()
+        game_state.add_conversation("system", "Game started", now=now)
+        game_state.add_conversation("assistant", scene_content, now=now)
         
         # Add opening event
-        game_state.add_event("Adventure begins")
-        
-        return scene_content
+        game_state.add_event("Adventure begins", now=now)
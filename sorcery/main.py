@@ -4,12 +4,8 @@
 import argparse
 import sys
 import os
-from pathlib import Path
 from typing import Optional
 
-from .game import Game
-from .config import Config
-
 
 def create_parser() -> argparse.ArgumentParser:
     """Create argument parser for Sorcery CLI."""
@@ -25,6 +21,15 @@ def create_parser() -> argparse.ArgumentParser:
         help="LLM model to use (default: gpt-4o-mini)",
     )
     
+    parser.add_argument(
+        "--fallback-model",
+        action="append",
+        default=[],
+        dest="fallback_models",
+        metavar="MODEL",
+        help="Model to fall back to if the main model is unavailable (repeatable)",
+    )
+    
     parser.add_argument(
         "--openai-api-key",
         help="Specify the OpenAI API key",
@@ -37,7 +42,6 @@ def create_parser() -> argparse.ArgumentParser:
     
     parser.add_argument(
         "--save-file",
-        type=Path,
         help="Path to save file (default: ~/.sorcery/save.json)",
     )
     
@@ -68,12 +72,18 @@ def main(args: Optional[list] = None) -> int:
     parsed_args = parser.parse_args(args)
     
     try:
+        # Imported here so --help and argument errors don't pay for loading
+        # the game and its LLM dependencies
+        from .config import Config
+        from .game import Game
+
         # Load configuration
         config = Config(
             model=parsed_args.model,
+            fallback_models=parsed_args.fallback_models,
             openai_api_key=parsed_args.openai_api_key,
             anthropic_api_key=parsed_args.anthropic_api_key,
-            save_file=parsed_args.save_file,
+            save_file=parsed_args.save_file,  # Config converts it to a Path
             new_game=parsed_args.new_game,
             debug=parsed_args.debug,
             no_color=parsed_args.no_color,
@@ -1,11 +1,30 @@
 """Game state management for Sorcery."""
 
-import json
+import gzip
+import os
+import shutil
+import sys
+import zlib
+from collections import deque
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+import pydantic_core
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Only the most recent history is kept in memory. The full history lives in
+# append-only JSONL logs next to the save file.
+MAX_EVENTS = 500
+MAX_CONVERSATION_TURNS = 200
+
+# The conversation log holds the full narrator text, which is verbose and
+# repetitive, so it is gzip compressed. Each save appends a gzip member.
+CONVERSATION_LOG_SUFFIX = ".conversation.jsonl.gz"
+
+# Fields persisted in the history logs rather than in the save file itself
+_HISTORY_FIELDS = frozenset({"events", "conversation_history"})
 
 
 class Character(BaseModel):
@@ -15,6 +34,7 @@ class Character(BaseModel):
     relationship: str = "neutral"
     knowledge: List[str] = Field(default_factory=list)
     first_met: Optional[datetime] = None
+    current_location: Optional[str] = None
 
 
 class Item(BaseModel):
@@ -73,33 +93,114 @@ class GameState(BaseModel):
     locations: Dict[str, Location] = Field(default_factory=dict)
     
     # Game history
-    events: List[GameEvent] = Field(default_factory=list)
-    conversation_history: List[Dict[str, str]] = Field(default_factory=list)
+    events: Deque[GameEvent] = Field(
+        default_factory=lambda: deque(maxlen=MAX_EVENTS)
+    )
+    conversation_history: Deque[Dict[str, str]] = Field(
+        default_factory=lambda: deque(maxlen=MAX_CONVERSATION_TURNS)
+    )
     
     # Game settings
     difficulty: str = "normal"
     custom_flags: Dict[str, Any] = Field(default_factory=dict)
     
+    # Location name -> names of characters currently there
+    # (a dict used as an insertion-ordered set, so listings are stable)
+    _characters_by_location: Dict[str, Dict[str, None]] = PrivateAttr(default_factory=dict)
+    
+    # Location name -> in-memory events that happened there, oldest first
+    _events_by_location: Dict[str, Deque[GameEvent]] = PrivateAttr(default_factory=dict)
+    
+    # History added since the last save, not yet in the logs. Bounded like
+    # the history itself; entries that roll off unsaved are never logged.
+    _unsaved_events: Deque[GameEvent] = PrivateAttr(
+        default_factory=lambda: deque(maxlen=MAX_EVENTS)
+    )
+    _unsaved_conversation: Deque[Dict[str, str]] = PrivateAttr(
+        default_factory=lambda: deque(maxlen=MAX_CONVERSATION_TURNS)
+    )
+    
+    # Save file whose history logs hold everything before the unsaved entries
+    _log_path: Optional[Path] = PrivateAttr(default=None)
+    
+    # Hash of the JSON last written to _log_path, to skip unchanged saves
+    _saved_hash: Optional[int] = PrivateAttr(default=None)
+    
+    # Directory already created by an earlier save
+    _save_dir: Optional[Path] = PrivateAttr(default=None)
+    
+    def model_post_init(self, __context: Any) -> None:
+        """Build the character location index and bound the history."""
+        for character in self.characters.values():
+            self._index_character(character)
+        # history given inline (e.g. by a save file from before the logs) has
+        # not been written to any log yet
+        self._unsaved_events = deque(self.events, maxlen=MAX_EVENTS)
+        self._unsaved_conversation = deque(
+            self.conversation_history, maxlen=MAX_CONVERSATION_TURNS
+        )
+        self.events = deque(self.events, maxlen=MAX_EVENTS)
+        self.conversation_history = deque(
+            self.conversation_history, maxlen=MAX_CONVERSATION_TURNS
+        )
+        self._index_events()
+    
+    def _index_events(self) -> None:
+        """Rebuild the event location index from the in-memory events."""
+        self._events_by_location = {}
+        for event in self.events:
+            if event.location is not None:
+                self._events_by_location.setdefault(event.location, deque()).append(event)
+    
+    def _index_character(self, character: Character) -> None:
+        if character.current_location is not None:
+            self._characters_by_location.setdefault(
+                character.current_location, {}
+            )[character.name] = None
+    
+    def _unindex_character(self, character: Character) -> None:
+        names = self._characters_by_location.get(character.current_location)
+        if names is not None:
+            names.pop(character.name, None)
+            if not names:
+                del self._characters_by_location[character.current_location]
+    
     def add_event(self, description: str, location: Optional[str] = None, 
                  characters: Optional[List[str]] = None, 
-                 items: Optional[List[str]] = None) -> None:
-        """Add an event to the game history."""
+                 items: Optional[List[str]] = None,
+                 now: Optional[datetime] = None) -> None:
+        """Add an event to the game history, timestamped now unless given."""
         event = GameEvent(
-            timestamp=datetime.now(),
+            timestamp=now or datetime.now(),
             description=description,
             location=location or self.current_location,
             characters_involved=characters or [],
             items_involved=items or []
         )
+        if len(self.events) == MAX_EVENTS:
+            # the oldest event is about to roll off; it is also the oldest at
+            # its location
+            oldest = self.events[0]
+            bucket = self._events_by_location.get(oldest.location)
+            if bucket:
+                bucket.popleft()
+                if not bucket:
+                    del self._events_by_location[oldest.location]
         self.events.append(event)
+        self._unsaved_events.append(event)
+        if event.location is not None:
+            self._events_by_location.setdefault(event.location, deque()).append(event)
     
-    def add_conversation(self, role: str, content: str) -> None:
-        """Add a conversation turn to history."""
-        self.conversation_history.append({
-            "role": role,
+    def add_conversation(self, role: str, content: str,
+                         now: Optional[datetime] = None) -> None:
+        """Add a conversation turn to history, timestamped now unless given."""
+        turn = {
+            "role": sys.intern(role),
             "content": content,
-            "timestamp": datetime.now().isoformat()
-        })
+            "timestamp": (now or datetime.now()).isoformat()
+        }
+        self.conversation_history.append(turn)
+        self._unsaved_conversation.append(turn)
     
     def get_character(self, name: str) -> Optional[Character]:
         """Get a character by name."""
@@ -109,7 +210,28 @@ class GameState(BaseModel):
         """Add or update a character."""
         if character.first_met is None:
             character.first_met = datetime.now()
+        character.name = sys.intern(character.name)
+        previous = self.characters.get(character.name)
+        if previous is not None:
+            self._unindex_character(previous)
         self.characters[character.name] = character
+        self._index_character(character)
+    
+    def move_character(self, name: str, location_name: Optional[str]) -> bool:
+        """Move a character to a location. Returns True if successful."""
+        character = self.characters.get(name)
+        if not character:
+            return False
+        
+        self._unindex_character(character)
+        character.current_location = location_name
+        self._index_character(character)
+        return True
+    
+    def get_characters_at(self, location_name: str) -> List[Character]:
+        """Get the characters currently at a location."""
+        names = self._characters_by_location.get(location_name, ())
+        return [self.characters[name] for name in names]
     
     def get_item(self, name: str) -> Optional[Item]:
         """Get an item from inventory."""
@@ -117,11 +239,9 @@ class GameState(BaseModel):
     
     def add_item(self, item: Item) -> None:
         """Add item to inventory."""
-        existing = self.items.get(item.name)
-        if existing:
+        existing = self.items.setdefault(item.name, item)
+        if existing is not item:
             existing.quantity += item.quantity
-        else:
-            self.items[item.name] = item
     
     def remove_item(self, name: str, quantity: int = 1) -> bool:
         """Remove item from inventory. Returns True if successful."""
@@ -131,11 +251,13 @@ class GameState(BaseModel):
         
         item.quantity -= quantity
         if item.quantity <= 0:
-            del self.items[name]
+            self.items.pop(name, None)
         return True
     
     def visit_location(self, location_name: str) -> None:
         """Mark a location as visited."""
+        # the current location is copied onto every event, so share one string
+        location_name = sys.intern(location_name)
         location = self.locations.get(location_name)
         if location:
             if not location.visited:
@@ -150,84 +272,242 @@ class GameState(BaseModel):
         self.current_location = location_name
     
     def save_to_file(self, filepath: Path) -> None:
-        """Save game state to JSON file."""
+        """Save game state to JSON file.
+        
+        The file holds everything but the event and conversation history,
+        which is appended to JSONL logs next to it, so a save only writes
+        the history added since the previous one. Nothing is written if
+        the state hasn't changed since it was last saved to filepath."""
+        if (
+            self._log_path == filepath
+            and not self._unsaved_events
+            and not self._unsaved_conversation
+            and hash(self._header_json()) == self._saved_hash
+            and filepath.exists()
+        ):
+            return
+        
         self.last_saved = datetime.now()
+        data = self._header_json()
         
-        # Convert to dict and handle datetime serialization
-        data = self.model_dump()
+        if filepath.parent != self._save_dir:
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            self._save_dir = filepath.parent
         
-        # Custom JSON encoder for datetime objects
-        def json_serializer(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+        # History first, so the save file never refers to missing history
+        previous = self._log_path
+        _write_log(
+            _events_log(filepath),
+            _events_log(previous) if previous else None,
+            self._unsaved_events,
+        )
+        _write_log(
+            _conversation_log(filepath),
+            _conversation_log(previous) if previous else None,
+            self._unsaved_conversation,
+        )
+        self._unsaved_events.clear()
+        self._unsaved_conversation.clear()
+        self._log_path = filepath
+        
+        # Replace the save file atomically so a crash mid-write can't corrupt
+        # it. There is no fsync here; see flush().
+        tmp_path = filepath.with_suffix(filepath.suffix + ".tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._saved_hash = hash(data)
+    
+    def flush(self) -> None:
+        """Force the last save through to disk.
         
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2, default=json_serializer)
+        Saves leave flushing to the OS, so call this once on exit."""
+        if self._log_path is None:
+            return
+        for path in (
+            self._log_path,
+            _events_log(self._log_path),
+            _conversation_log(self._log_path),
+        ):
+            _fsync(path, os.O_RDWR)
+        # the directory entry too, so the rename in save_to_file is durable
+        # (not possible on Windows, where directories can't be opened)
+        _fsync(self._log_path.parent, os.O_RDONLY)
+    
+    def _header_json(self) -> bytes:
+        # Serialized straight to JSON bytes; datetimes come out as ISO 8601
+        return _GAME_STATE_SERIALIZER.to_json(
+            self, indent=2, exclude=_HISTORY_FIELDS
+        )
     
     @classmethod
     def load_from_file(cls, filepath: Path) -> 'GameState':
-        """Load game state from JSON file."""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        
-        # Convert datetime strings back to datetime objects
-        def convert_datetime_fields(obj, fields):
-            for field in fields:
-                if field in obj and obj[field]:
-                    try:
-                        obj[field] = datetime.fromisoformat(obj[field])
-                    except (ValueError, TypeError):
-                        pass
-        
-        # Convert top-level datetime fields
-        convert_datetime_fields(data, ['created_at', 'last_saved'])
+        """Load game state from JSON file and the tail of its history logs."""
+        # Pydantic parses the ISO 8601 datetime strings itself
+        state = _GAME_STATE_VALIDATOR.validate_json(filepath.read_bytes())
         
-        # Convert character datetime fields
-        for char_data in data.get('characters', {}).values():
-            convert_datetime_fields(char_data, ['first_met'])
-        
-        # Convert location datetime fields
-        for loc_data in data.get('locations', {}).values():
-            convert_datetime_fields(loc_data, ['first_visited'])
-        
-        # Convert event datetime fields
-        for event_data in data.get('events', []):
-            convert_datetime_fields(event_data, ['timestamp'])
-        
-        return cls(**data)
+        # Logged history comes before anything the file held inline. The
+        # logs are streamed and only the lines that fit in memory are parsed.
+        event_lines = deque(_read_log(_events_log(filepath)), maxlen=MAX_EVENTS)
+        logged_events = map(GameEvent.model_validate_json, event_lines)
+        state.events = deque(chain(logged_events, state.events), maxlen=MAX_EVENTS)
+        turn_lines = deque(
+            _read_log(_conversation_log(filepath)), maxlen=MAX_CONVERSATION_TURNS
+        )
+        logged_turns = map(pydantic_core.from_json, turn_lines)
+        state.conversation_history = deque(
+            chain(logged_turns, state.conversation_history),
+            maxlen=MAX_CONVERSATION_TURNS,
+        )
+        state._index_events()
+        state._log_path = filepath
+        return state
+    
+    def get_events_at(self, location_name: str) -> List[GameEvent]:
+        """Get the in-memory events that happened at a location, oldest first."""
+        return list(self._events_by_location.get(location_name, ()))
     
     def get_recent_events(self, limit: int = 10) -> List[GameEvent]:
         """Get the most recent events."""
-        return self.events[-limit:] if self.events else []
+        start = max(0, len(self.events) - limit)
+        return list(islice(self.events, start, None))
     
     def get_inventory_summary(self) -> str:
         """Get a summary of the player's inventory."""
         if not self.items:
             return "Your inventory is empty."
         
-        summary = "Inventory:\n"
+        lines = ["Inventory:"]
         for item in self.items.values():
             quantity_str = f" (x{item.quantity})" if item.quantity > 1 else ""
-            summary += f"- {item.name}{quantity_str}: {item.description}\n"
+            lines.append(f"- {item.name}{quantity_str}: {item.description}")
         
-        return summary.strip()
+        return "\n".join(lines).strip()
     
     def get_stats_summary(self) -> str:
         """Get a summary of the player's stats."""
         stats = self.player_stats
-        summary = f"Stats for {self.player_name}:\n"
-        summary += f"Health: {stats.health}/100\n"
-        summary += f"Strength: {stats.strength}/100\n"
-        summary += f"Wisdom: {stats.wisdom}/100\n"
-        summary += f"Mana: {stats.mana}/100\n"
-        summary += f"Charisma: {stats.charisma}/100\n"
-        summary += f"Gold: {stats.gold}\n"
+        lines = [
+            f"Stats for {self.player_name}:",
+            f"Health: {stats.health}/100",
+            f"Strength: {stats.strength}/100",
+            f"Wisdom: {stats.wisdom}/100",
+            f"Mana: {stats.mana}/100",
+            f"Charisma: {stats.charisma}/100",
+            f"Gold: {stats.gold}",
+        ]
         
         if stats.custom_stats:
-            summary += "\nCustom Stats:\n"
-            for key, value in stats.custom_stats.items():
-                summary += f"{key}: {value}\n"
+            lines.append("\nCustom Stats:")
+            lines.extend(f"{key}: {value}" for key, value in stats.custom_stats.items())
         
-        return summary.strip()
+        return "\n".join(lines).strip()
+
+
+# The log names extend the full save file name, so saves that only differ in
+# their extension (slot.json, slot.bak) keep separate histories
+def _events_log(filepath: Path) -> Path:
+    return filepath.with_name(filepath.name + ".events.jsonl")
+
+
+def _conversation_log(filepath: Path) -> Path:
+    return filepath.with_name(filepath.name + CONVERSATION_LOG_SUFFIX)
+
+
+def _open_log(log_path: Path, mode: str):
+    if log_path.suffix == ".gz":
+        return gzip.open(log_path, mode)
+    return open(log_path, mode)
+
+
+def _write_log(log_path: Path, previous: Optional[Path], entries: list) -> None:
+    """Append entries to a JSONL history log.
+    
+    previous is the log holding the history written so far. When saving to
+    a different file it is copied over first, or the log is started fresh
+    if there is none."""
+    if previous is None or not _same_file(log_path, previous):
+        if previous is not None and previous.exists():
+            shutil.copyfile(previous, log_path)
+        else:
+            log_path.write_bytes(b"")
+    if not entries:
+        return
+    with _open_log(log_path, 'ab') as f:
+        for entry in entries:
+            f.write(pydantic_core.to_json(entry))
+            f.write(b"\n")
+
+
+def _same_file(a: Path, b: Path) -> bool:
+    """Whether two paths name the same existing file."""
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _fsync(path: Path, flags: int) -> None:
+    """fsync a file or directory, ignoring paths that can't be opened."""
+    try:
+        fd = os.open(path, flags)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _read_log(log_path: Path):
+    """Yield the lines of a JSONL history log, if it exists.
+    
+    A crash mid-append can leave a torn last record. It is skipped, and the
+    log rewritten without it so the next append doesn't land behind it."""
+    try:
+        f = _open_log(log_path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        torn = yield from _complete_lines(f)
+    if torn:
+        _rewrite_log(log_path)
+
+
+def _complete_lines(f):
+    """Yield the complete, non-blank lines of an open log.
+    
+    Returns True if the log ends in a torn record."""
+    try:
+        for line in f:
+            if not line.endswith(b"\n"):
+                return True
+            if line.strip():
+                yield line
+    except (EOFError, gzip.BadGzipFile, zlib.error):
+        # a gzip member cut short
+        return True
+    return False
+
+
+def _rewrite_log(log_path: Path) -> None:
+    """Replace a log with its complete lines."""
+    # keeps the .gz suffix, so the copy is compressed the same way
+    tmp_path = log_path.with_suffix(".tmp" + log_path.suffix)
+    try:
+        with _open_log(log_path, 'rb') as src, _open_log(tmp_path, 'wb') as dst:
+            dst.writelines(_complete_lines(src))
+        os.replace(tmp_path, log_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+# Bound once so saving and loading call straight into pydantic-core
+_GAME_STATE_SERIALIZER = GameState.__pydantic_serializer__
+_GAME_STATE_VALIDATOR = GameState.__pydantic_validator__